@@ -6,16 +6,32 @@
     This doesn't cover all possible request of Cognigy but it's fairly easy to add new ones. 
 """
 
-import warnings 
-warnings.filterwarnings('ignore')
-
-from tqdm import tqdm # progress bar
+import threading
 
+from cachetools import TTLCache, cached
+from cachetools.keys import hashkey
 
 import openapi_client # Import helper function for Cognitive OpenAPI requests
 
+# Cache for users, so repeated lookups of the same user within 5 minutes don't hit the API again.
+_user_cache = TTLCache(maxsize=4096, ttl=300)
+_user_cache_lock = threading.Lock()
+
+def _user_cache_key(base_url, user_id):
+    """
+    Cache key for users. The url is normalised and the API key is left out,
+    so a trailing slash or different key doesn't cause a cache miss.
+    """
+    return hashkey(base_url.rstrip('/'), user_id)
+
+def clear_cache():
+    """
+    Empties the user cache.
+    """
+    with _user_cache_lock:
+        _user_cache.clear()
 
-def get_audit_events(base_url, api_key, params=None):
+def get_audit_events(base_url, api_key, params=None, stream=False):
     """
     get-/management/v2.0/audit/events
 
@@ -26,6 +42,8 @@ def get_audit_events(base_url, api_key, params=None):
         api_key (str): The API key for authentication.
         params (dict, optional): A dictionary containing parameters to add to the query. 
                                  Defaults to None.
+        stream (bool, optional): Parse the pages incrementally, which lowers the peak memory for
+                                 large results but fetches the pages one after another. Defaults to False.
 
     Returns:
         list: A list of dictionaries containing details of all audit events.
@@ -43,7 +61,8 @@ def get_audit_events(base_url, api_key, params=None):
         base_url=base_url,
         endpoint=audit_events_endpoint,
         api_key=api_key,
-        params=params
+        params=params,
+        stream=stream
     )
 
 
@@ -52,6 +71,34 @@ def get_audit_events(base_url, api_key, params=None):
 
 
 
+def iter_audit_events(base_url, api_key, params=None):
+    """
+    get-/management/v2.0/audit/events
+
+    Streams all audit events one by one. Unlike get_audit_events, the pages are parsed incrementally
+    and never held in memory as a whole.
+
+    Args:
+        base_url (str): The base URL of the API.
+        api_key (str): The API key for authentication.
+        params (dict, optional): A dictionary containing parameters to add to the query. 
+                                 Defaults to None.
+
+    Yields:
+        dict: The details of a single audit event.
+
+    """
+    # Define the endpoint for retrieving the list of audit events
+    audit_events_endpoint = "auditevents"
+
+    # Stream the audit events
+    yield from openapi_client.iter_items_api_key(
+        base_url=base_url,
+        endpoint=audit_events_endpoint,
+        api_key=api_key,
+        params=params
+    )
+
 def post_deprecate_password(base_url, api_key, user_id):
     """
     post-/management/v2.0/users/-userId-/deprecatePassword
@@ -69,7 +116,7 @@ def post_deprecate_password(base_url, api_key, user_id):
 
     """
     # Define the endpoint for deprecating the password of a user
-    deprecate_password_endpoint = f"users/deprecatepassword"
+    deprecate_password_endpoint = "users/deprecatepassword"
 
     # Make a query to deprecate the password of a user
     password_deprecated_bool = openapi_client.post_requests_api_key(
@@ -82,9 +129,10 @@ def post_deprecate_password(base_url, api_key, user_id):
     # Return if password was deprecated
     return password_deprecated_bool
 
+@cached(_user_cache, key=lambda base_url, api_key, user_id: _user_cache_key(base_url, user_id), lock=_user_cache_lock)
 def get_user_by_id(base_url, api_key, user_id):
     response = openapi_client.get_requests_api_key(
-            base_url,
+            base_url.rstrip('/'),
             f"users/{user_id}",
             api_key, {}
         )
@@ -117,4 +165,31 @@ def delete_project_by_id(base_url, api_key, project_id):
     )
 
     # Return if the project was successfully deleted
-    return project_deleted_bool
\ No newline at end of file
+    return project_deleted_bool
+
+def delete_projects_by_ids(base_url, api_key, project_ids):
+    """
+    Deletes several projects concurrently by their project IDs.
+
+    Args:
+        base_url (str): The base URL of the API.
+        api_key (str): The API key for authentication.
+        project_ids (list): The IDs of the projects to be deleted.
+
+    Returns:
+        list: One bool per project ID, True if the project was successfully deleted.
+
+    Raises:
+        Exception: If a deletion fails or the API returns an error.
+    """
+
+    # Make the DELETE requests for all projects concurrently
+    projects_deleted_bools = openapi_client.delete_many_requests_api_key(
+        base_url=base_url,
+        endpoint_template="projects/{id}",
+        ids=project_ids,
+        api_key=api_key
+    )
+
+    # Return which projects were successfully deleted
+    return projects_deleted_bools
@@ -7,44 +7,50 @@
 
 """
 
-import warnings 
-warnings.filterwarnings('ignore')
+import asyncio
+import aiohttp
+import threading
 
-import requests
 from requests.auth import HTTPBasicAuth
 
-from tqdm import tqdm # progress bar
-import json
+from cachetools import TTLCache, cached
+from cachetools.keys import hashkey
+
+from tqdm.asyncio import tqdm as tqdm_asyncio # progress bar
 
 import openapi_client # Import helper function for Cognitive OpenAPI requests
+from openapi_client import load_management_ui_credentials # noqa: F401 Re-exported for existing callers
 import logging
 
+# Maximum number of user detail requests which are in flight at the same time
+MAX_CONCURRENT_REQUESTS = 16
+# Number of users which are fetched with one request, if the server supports filtering the user list by ids
+BULK_BATCH_SIZE = 50
 
-def load_management_ui_credentials(path_to_secrets_json):
-    """
-    Loads and retrieves username and password from a JSON file containing secret information.
-
-    Args:
-        secrets_json (str): The path to the JSON file containing secret information.
+# Whether the user list of a base url supports filtering by ids, probed on first use
+_bulk_support = {}
 
-    Returns:
-        tuple: A tuple containing the username and password retrieved from the JSON file.
+# Cache for user details, so repeated lookups of the same user within 5 minutes don't hit the API again.
+# Keyed by (url, user_id); shared by get_user_details and the async admin lookup.
+_user_cache = TTLCache(maxsize=4096, ttl=300)
+_user_cache_lock = threading.Lock()
 
-    Example:
-        username, password = load_management_ui_credentials("path/to/secrets.json")
-        print("Username:", username)
-        print("Password:", password)
+def _user_cache_key(url, user_id):
     """
-    # Open the JSON file containing secret information
-    with open(path_to_secrets_json) as f:
-        # Load the JSON content
-        json_content = json.load(f)
+    Cache key for user details. The url is normalised and the credentials are left out,
+    so a trailing slash or different login doesn't cause a cache miss.
+    """
+    return hashkey(url.rstrip('/'), user_id)
 
-    # Retrieve and return the username and password from the JSON content
-    return json_content["username"], json_content["password"]
+def clear_cache():
+    """
+    Empties the user details cache.
+    """
+    with _user_cache_lock:
+        _user_cache.clear()
 
 
-def get_user_list(url, username, password):
+def get_user_list(url, username, password, params=None):
     """
     get-/management/v2.0/users
     
@@ -54,6 +60,7 @@ def get_user_list(url, username, password):
         url (str): The base URL of the API.
         username (str): The username for authentication.
         password (str): The password for authentication.
+        params (dict, optional): Query parameters, e.g. a server-side filter. Defaults to None.
 
     Returns:
         list: A list of dictionaries containing details of all users.
@@ -72,12 +79,41 @@ def get_user_list(url, username, password):
         base_url=url,
         endpoint=user_list_endpoint,
         username=username,
-        password=password
+        password=password,
+        params=params
     )
 
     # Return the list of details for all users
     return user_list
 
+def iter_user_list(url, username, password, params=None):
+    """
+    get-/management/v2.0/users
+
+    Iterates over all users. Unlike get_user_list, the pages are fetched while iterating,
+    so memory stays constant and the loop can be stopped early.
+
+    Args:
+        url (str): The base URL of the API.
+        username (str): The username for authentication.
+        password (str): The password for authentication.
+        params (dict, optional): Query parameters, e.g. a server-side filter. Defaults to None.
+
+    Yields:
+        dict: The details of a single user.
+    """
+    # Define the endpoint for retrieving the list of users
+    user_list_endpoint = "new/management/v2.0/users"
+
+    yield from openapi_client.iter_items_basic_auth(
+        base_url=url,
+        endpoint=user_list_endpoint,
+        username=username,
+        password=password,
+        params=params
+    )
+
+@cached(_user_cache, key=lambda url, username, password, user_id: _user_cache_key(url, user_id), lock=_user_cache_lock)
 def get_user_details(url, username, password, user_id):
     """
     get-/management/v2.0/users/-userId-
@@ -103,6 +139,8 @@ def get_user_details(url, username, password, user_id):
         else:
             print("Failed to retrieve user details.")
     """
+    url = url.rstrip('/')
+
     # Define the endpoint for retrieving details of a specific user
     user_details_endpoint = f"new/management/v2.0/users/{user_id}"
 
@@ -117,7 +155,7 @@ def get_user_details(url, username, password, user_id):
     # Return the details of the user
     return user_details
 
-def get_admin_user_ids(url, username, password):
+def get_admin_user_ids(url, username, password, progress=True):
     """
     Retrieves a list of user details for users with the 'admin' role of all organisations.
 
@@ -125,6 +163,7 @@ def get_admin_user_ids(url, username, password):
         url (str): The base URL of the API.
         username (str): The username for authentication.
         password (str): The password for authentication.
+        progress (bool, optional): Show a progress bar when running in a terminal. Defaults to True.
 
     Returns:
         list: A list of dictionaries containing details of users with the 'admin' role.
@@ -136,24 +175,199 @@ def get_admin_user_ids(url, username, password):
             print("Admin User Details:", user)
     """
 
-    # Make a query to get the list of users
-    user_list = get_user_list(url, username, password)
+    return asyncio.run(get_admin_user_ids_async(url, username, password, progress=progress))
+
+def _client_session(username, password, max_concurrency=MAX_CONCURRENT_REQUESTS):
+    """
+    Creates the aiohttp session for the async requests, with basic auth and a capped connection pool.
+    """
+    return openapi_client.async_session(aiohttp.BasicAuth(username, password), max_concurrency)
+
+async def _fetch_user(session, sem, url, user_id):
+    """
+    Fetches the details of a single user. Results are stored in the user details cache.
+    """
+    # Return the cached details if the user was fetched recently
+    url = url.rstrip('/')
+    cache_key = _user_cache_key(url, user_id)
+    with _user_cache_lock:
+        user_details = _user_cache.get(cache_key)
+    if user_details is not None:
+        return user_details
+
+    # Define the endpoint for retrieving details of a specific user
+    user_details = await openapi_client.fetch_json(session, sem, f"{url}/new/management/v2.0/users/{user_id}")
+
+    with _user_cache_lock:
+        _user_cache[cache_key] = user_details
+    return user_details
+
+async def _fetch_users_batch(session, sem, url, user_ids):
+    """
+    Fetches the details of several users with a single request to the user list, filtered by their ids.
+    Returns None if the server doesn't support this, i.e. it rejected or ignored the filter or returned the users
+    without roles. The url is then marked as not supporting bulk requests.
+    """
+    users_url = f"{url}/new/management/v2.0/users"
+    params = {"ids": ",".join(user_ids), "limit": len(user_ids)}
+
+    try:
+        user_list = await openapi_client.fetch_json(session, sem, users_url, params=params)
+        # The server may cap the limit below the batch size, so follow the pages of the filtered list
+        user_list = await openapi_client.handle_pagination_async(session, sem, user_list, users_url, params=params)
+    except aiohttp.ClientResponseError as e:
+        # A client error means the unknown "ids" parameter was rejected. Rate limiting is a real error though.
+        if not 400 <= e.status < 500 or e.status == 429:
+            raise
+        logging.debug("Filtering the user list by ids is not supported by %s: %s", url, e.status)
+        _bulk_support[url] = False
+        return None
+
+    users = user_list.get("items", [])
+    if not {user["_id"] for user in users} <= set(user_ids) or not all("roles" in user for user in users):
+        _bulk_support[url] = False
+        return None
+
+    with _user_cache_lock:
+        for user in users:
+            _user_cache[_user_cache_key(url, user["_id"])] = user
+
+    # Never drop users silently: whoever is missing from the filtered list (e.g. cut off without a cursor)
+    # is fetched on its own
+    returned_ids = {user["_id"] for user in users}
+    missing_ids = [user_id for user_id in user_ids if user_id not in returned_ids]
+    if missing_ids:
+        logging.debug("%s of %s users missing from the filtered user list, fetching them one by one", len(missing_ids), len(user_ids))
+        users += await asyncio.gather(*[_fetch_user(session, sem, url, user_id) for user_id in missing_ids])
+
+    return users
+
+async def _fetch_users(session, sem, url, user_ids, batch_size=BULK_BATCH_SIZE):
+    """
+    Fetches the details of several users. If the server supports it, batch_size users are fetched per request,
+    otherwise one request per user is made. Support is probed with the first batch once per url.
+    """
+    url = url.rstrip('/')
+
+    # Take the recently fetched users from the cache
+    with _user_cache_lock:
+        cached_users = [_user_cache.get(_user_cache_key(url, user_id)) for user_id in user_ids]
+    all_user_details = [user for user in cached_users if user is not None]
+    user_ids = [user_id for user_id, user in zip(user_ids, cached_users) if user is None]
+    if not user_ids:
+        return all_user_details
 
-    # Initialize an empty list to store details of admin users
-    admin_user_ids = []
+    if _bulk_support.get(url, True):
+        batches = [user_ids[i:i + batch_size] for i in range(0, len(user_ids), batch_size)]
 
-    # Iterate through each user in the user list
-    for user in tqdm(user_list['items']):
-        # Define the endpoint for retrieving details of a specific user
-        user_details = get_user_details(url, username, password, user["_id"])
+        first_batch = await _fetch_users_batch(session, sem, url, batches[0])
 
-        # Check if the user has the 'admin' role
-        if "admin" in user_details["roles"]:
-            # Add the details of the admin user to the list
-            admin_user_ids.append(user_details)
+        if first_batch is not None:
+            _bulk_support[url] = True
+            other_batches = await asyncio.gather(*[_fetch_users_batch(session, sem, url, batch) for batch in batches[1:]])
+            if all(batch is not None for batch in other_batches):
+                return all_user_details + first_batch + [user for batch in other_batches for user in batch]
 
-    # Return the list of details for users with the 'admin' role
-    return admin_user_ids
+            # The server stopped honouring the filter, fetch everything one by one
+
+    all_user_details += await asyncio.gather(*[_fetch_user(session, sem, url, user_id) for user_id in user_ids])
+    return all_user_details
+
+def get_users_bulk(url, username, password, user_ids, batch_size=BULK_BATCH_SIZE):
+    """
+    get-/management/v2.0/users?ids=...
+
+    Get full data of several users. If the server supports filtering the user list by ids, batch_size users
+    are fetched per request, otherwise it falls back to one request per user. The requests run concurrently.
+
+    Args:
+        url (str): The base URL of the API.
+        username (str): The username for authentication.
+        password (str): The password for authentication.
+        user_ids (list): The IDs of the users for which to retrieve the details.
+        batch_size (int, optional): Number of users per request. Defaults to 50.
+
+    Returns:
+        list: A list of dictionaries containing the details of the users.
+
+    Example:
+        users = get_users_bulk("https://api.example.com", "my_username", "my_password", ["user123", "user456"])
+    """
+    async def fetch():
+        async with _client_session(username, password) as session:
+            return await _fetch_users(session, asyncio.Semaphore(MAX_CONCURRENT_REQUESTS), url, list(user_ids), batch_size)
+
+    return asyncio.run(fetch())
+
+async def get_admin_user_ids_async(url, username, password, max_concurrency=MAX_CONCURRENT_REQUESTS, progress=True):
+    """
+    Async version of get_admin_user_ids. The user details are fetched concurrently instead of one after another.
+
+    Args:
+        url (str): The base URL of the API.
+        username (str): The username for authentication.
+        password (str): The password for authentication.
+        max_concurrency (int, optional): Maximum number of concurrent user detail requests. Defaults to 16.
+        progress (bool, optional): Show a progress bar of the fetched user details when running in a terminal.
+                                   Its total grows while the pages of the user list arrive. Defaults to True.
+
+    Returns:
+        list: A list of dictionaries containing details of users with the 'admin' role.
+
+    Example:
+        admin_users = asyncio.run(get_admin_user_ids_async("https://api.example.com", "my_username", "my_password"))
+    """
+    # Iterate over the pages of the user list. Fetching a page blocks, so that runs in a worker thread.
+    # The detail requests of a page are started right away, while the next page is still loading.
+    user_list_pages = openapi_client.iter_pages_basic_auth(url, "new/management/v2.0/users", username, password)
+
+    # Only the admins are kept, the details of all other users are dropped as soon as they arrive
+    admin_users = []
+    tasks = []
+
+    sem = asyncio.Semaphore(max_concurrency)
+
+    # Counts users, not requests. Refreshed at most twice a second, and not at all outside of a terminal.
+    with tqdm_asyncio(total=0, unit="user", mininterval=0.5, disable=None if progress else True) as progress_bar:
+        # Use one session for all requests so connections are reused
+        async with _client_session(username, password, max_concurrency) as session:
+            # The page which is loading in the worker thread
+            next_page = None
+            try:
+                while True:
+                    # Shielded, so a cancellation doesn't abandon the worker thread while it's inside the generator
+                    next_page = asyncio.create_task(asyncio.to_thread(next, user_list_pages, None))
+                    page = await asyncio.shield(next_page)
+                    if page is None:
+                        break
+
+                    # If the user list already contains the roles, no extra request is needed for those users
+                    admin_users += [user for user in page['items'] if "admin" in user.get("roles", ())]
+
+                    user_ids_without_roles = [user["_id"] for user in page['items'] if "roles" not in user]
+                    if user_ids_without_roles:
+                        task = asyncio.create_task(_fetch_users(session, sem, url, user_ids_without_roles))
+                        task.add_done_callback(lambda _, count=len(user_ids_without_roles): progress_bar.update(count))
+                        tasks.append(task)
+                        progress_bar.total += len(user_ids_without_roles)
+                        progress_bar.refresh()
+
+                for page_user_details in await asyncio.gather(*tasks):
+                    admin_users += [user_details for user_details in page_user_details if "admin" in user_details["roles"]]
+            except BaseException:
+                # If the user list can't be read or a detail request fails, don't leave the other detail
+                # requests running against the closing session, and collect their results so no error goes unseen
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+            finally:
+                # The generator can't be closed while the worker thread is still loading a page from it
+                if next_page is not None:
+                    await asyncio.gather(next_page, return_exceptions=True)
+                user_list_pages.close()
+
+    return admin_users
 
 def get_all_organisations(url, username, password):
     """
@@ -218,20 +432,18 @@ def create_temporary_api_key(base_url, username, password, organisation_id):
     # Construct the URL for the API key request
     url = f"{base_url}/new/management/v2.0/organisations/{organisation_id}/apikeys"
 
-    # Define headers for the HTTP request
-    headers = {
-        "Accept": "application/json",
-    }
-
     # Make a POST request to the API to retrieve the API key
-    response = requests.post(url, headers=headers, auth=HTTPBasicAuth(username, password))
+    response = openapi_client.SESSION.post(url, auth=HTTPBasicAuth(username, password), timeout=openapi_client.TIMEOUT)
 
     # Check if the request was successful (status code 2xx)
     if response.ok:
-        logging.debug(f"Retrieved API Key for Organization ID: {organisation_id}")
-        logging.debug(f"API Key Response: {response.json()}")
+        api_key = response.json()
+        logging.debug("Retrieved API Key for Organization ID: %s", organisation_id)
+        # Formatting the whole response is only worth it if it is actually logged
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("API Key Response: %s", api_key)
         # Return the API key information in JSON format
-        return response.json()
+        return api_key
     else:
         # Raise an exception if the HTTP request fails
         response.raise_for_status()
@@ -15,8 +15,6 @@ import endpoints_managment_ui as via_mgmt_ui
 import endpoints_api_key as via_api_key
 
 # Import other modules
-from tqdm import tqdm # progress bar
-
 import logging
 
 # Configure the logging module
@@ -57,7 +55,7 @@ if __name__ == "__main__":
 
     #### For Management UI Authentication
     # If you want to use the management UI to get the credentials, you can use the following code
-    logging.info(f"Using {API_URL} as base URL")
+    logging.info("Using %s as base URL", API_URL)
     USERNAME, PASSWORD = via_mgmt_ui.load_management_ui_credentials("secrets.json")
 
     #### For API Key Authentication ####
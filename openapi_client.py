@@ -7,42 +7,342 @@
     3. HTTP Methods: Includes functions for GET, POST, PATCH, and DELETE requests
 """
 
-import warnings 
-warnings.filterwarnings('ignore')
-
+import aiohttp
+import asyncio
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
-import json
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
+import functools
+import ijson
+import itertools
 import logging
+import orjson
+import os
+import random
+import ssl
+import threading
+
+from cachetools import TTLCache
+
+# ETags and bodies of GET responses, keyed by (url including query, Authorization, X-API-Key).
+# Used to revalidate repeated requests with If-None-Match, so unchanged data comes back as an empty 304.
+# Bounded by the size of the stored bodies, not the number of entries, and entries expire after 10 minutes.
+ETAG_CACHE_MAX_BYTES = 32 * 1024 * 1024
+ETAG_CACHE_TTL = 600
+# Larger bodies (e.g. big audit event pages) aren't kept at all
+ETAG_CACHE_MAX_ENTRY_BYTES = 1024 * 1024
+
+_etag_cache = TTLCache(maxsize=ETAG_CACHE_MAX_BYTES, ttl=ETAG_CACHE_TTL, getsizeof=lambda entry: len(entry[1]))
+_etag_cache_lock = threading.Lock()
+
+# One TLS context with the CA bundle loaded once, shared by all connection pools and the aiohttp sessions
+_SSL_CONTEXT = ssl.create_default_context(cafile=requests.certs.where())
+
+class _ETagAdapter(HTTPAdapter):
+    """
+    HTTPAdapter which revalidates GET requests with ETags.
+
+    The body of GET responses with an ETag is kept for a while, see ETAG_CACHE_TTL. When the same request is made again, it is sent
+    with If-None-Match and a 304 answer is turned back into a 200 response with the cached body.
+    Streamed requests are passed through unchanged.
+
+    Its connection pools use the shared _SSL_CONTEXT, so the CA bundle isn't read again for every new connection.
+    """
+    def build_connection_pool_key_attributes(self, request, verify, cert=None):
+        host_params, pool_kwargs = super().build_connection_pool_key_attributes(request, verify, cert)
+        # Only for the default verification, so a custom CA bundle or verify=False never changes the shared context
+        if verify is True and cert is None:
+            pool_kwargs["ssl_context"] = _SSL_CONTEXT
+        return host_params, pool_kwargs
+
+    def cert_verify(self, conn, url, verify, cert):
+        super().cert_verify(conn, url, verify, cert)
+        # The default bundle is already loaded into _SSL_CONTEXT
+        if verify is True and getattr(conn, "conn_kw", {}).get("ssl_context") is _SSL_CONTEXT:
+            conn.ca_certs = None
+            conn.ca_cert_dir = None
+
+    def send(self, request, stream=False, **kwargs):
+        if request.method != "GET" or stream:
+            return super().send(request, stream=stream, **kwargs)
+
+        cache_key = (request.url, request.headers.get("Authorization"), request.headers.get("X-API-Key"))
+        with _etag_cache_lock:
+            cached = _etag_cache.get(cache_key)
+        if cached is not None:
+            request.headers["If-None-Match"] = cached[0]
+
+        response = super().send(request, stream=stream, **kwargs)
+
+        if response.status_code == 304 and cached is not None:
+            logging.debug("Not modified, using cached response for %s", request.url)
+            # Read the (empty) body first, which releases the connection back to the pool
+            response.content
+            response.status_code = 200
+            response.reason = "OK"
+            response._content = cached[1]
+        elif response.status_code == 200 and response.headers.get("ETag") and len(response.content) <= ETAG_CACHE_MAX_ENTRY_BYTES:
+            with _etag_cache_lock:
+                _etag_cache[cache_key] = (response.headers["ETag"], response.content)
+
+        return response
+
+# (connect, read) timeout in seconds, so a hanging server can't block a pagination loop forever
+TIMEOUT = (3.05, 60)
+
+# Maximum number of pages which are requested at the same time
+MAX_CONCURRENT_PAGES = 16
+
+# Maximum number of open connections in total (async client) and per host (shared session)
+MAX_CONNECTIONS = 64
+
+# Transient errors (rate limiting, 5xx, connection resets) are retried with exponential backoff.
+# Used by the shared session and the async requests.
+MAX_RETRIES = 5
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+RETRY_BACKOFF_FACTOR = 0.5
+
+# Requests with these methods may already have been processed when a read error or a 5xx occurs,
+# e.g. a POST which creates an API key. Sending them again could create duplicates.
+_NON_IDEMPOTENT_METHODS = frozenset(['POST', 'PATCH'])
+
+class _Retry(Retry):
+    """
+    Retry which only repeats non-idempotent requests if the server rejected them without processing them,
+    i.e. a 429 or 503 answer with a Retry-After header. Read errors are never retried for them, because
+    those methods aren't in allowed_methods. Connection errors are retried, as the request wasn't sent yet.
+    """
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if method.upper() in _NON_IDEMPOTENT_METHODS:
+            return bool(self.total and has_retry_after and status_code in (429, 503))
+        return super().is_retry(method, status_code, has_retry_after)
+
+_RETRY = _Retry(
+    total=MAX_RETRIES,
+    backoff_factor=RETRY_BACKOFF_FACTOR,
+    status_forcelist=RETRY_STATUS_CODES,
+    allowed_methods=frozenset(['GET', 'PUT', 'DELETE']),
+    respect_retry_after_header=True,
+    raise_on_status=False
+)
+
+# Shared session so that all requests (and especially pagination loops) reuse
+# keep-alive connections instead of doing a new TCP/TLS handshake per call.
+SESSION = requests.Session()
+_ADAPTER = _ETagAdapter(pool_connections=32, pool_maxsize=MAX_CONNECTIONS, max_retries=_RETRY)
+SESSION.mount("https://", _ADAPTER)
+SESSION.mount("http://", _ADAPTER)
+
+# Ask for compressed responses. Brotli is only requested if the optional "brotli" package is installed,
+# because urllib3 and aiohttp need it to decode "br" encoded bodies.
+try:
+    import brotli # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+# Sent with every request of the sync and the async session. All endpoints answer with JSON.
+_DEFAULT_HEADERS = {"Accept": "application/json", "Accept-Encoding": ACCEPT_ENCODING}
+SESSION.headers.update(_DEFAULT_HEADERS)
+
+# Header for requests with a JSON body. The Accept header is already set on the session.
+_JSON_BODY_HEADERS = {'Content-Type': 'application/json'}
+
+# Asks the server for a reduced representation of the items, where supported
+_PREFER_MINIMAL_HEADERS = {'Prefer': 'return=minimal'}
+
+@functools.lru_cache(maxsize=8)
+def _auth(username, password):
+    """
+    Returns the HTTPBasicAuth for a user, so it isn't created again for every request and page.
+    """
+    return HTTPBasicAuth(username, password)
+
+def close_session():
+    """
+    Closes the pooled connections of the shared session, e.g. when a long running script shuts down.
+    """
+    SESSION.close()
+
+def _loads(response):
+    """
+    Helper function to decode a JSON response body with orjson, which is considerably faster than response.json().
+    """
+    return orjson.loads(response.content)
+
+def _dumps(json_payload):
+    """
+    Helper function to encode a JSON request body with orjson instead of the json module used by requests.
+    The Content-Type header has to be set by the caller. Non-string keys are converted like json.dumps does.
+    """
+    return orjson.dumps(json_payload, option=orjson.OPT_NON_STR_KEYS)
 
 def get_size_of_response(response):
     """
-    Helper function to get the size of a response in bytes, kb and mb.
+    Helper function to log the size of a response in mb. Only does work if debug logging is enabled.
+    The Content-Length header is preferred so the body doesn't need to be touched. Without it, the size
+    is only measured if the body was read anyway, so a streamed response is never buffered here.
     """
-    size_in_bytes = len(response.content)
-    size_in_mb = size_in_bytes / 1024 / 1024 # conversion in mb
-    logging.info(f"Response size: {size_in_mb} MB")
+    if not logging.getLogger().isEnabledFor(logging.DEBUG):
+        return
+
+    size_in_bytes = response.headers.get("Content-Length")
+    if size_in_bytes is not None:
+        size_in_bytes = int(size_in_bytes)
+    elif response._content_consumed:
+        size_in_bytes = len(response.content)
+    else:
+        logging.debug("Response size: unknown (streamed response without Content-Length)")
+        return
+
+    logging.debug(
+        "Response size: %.2f MB (Content-Encoding: %s)",
+        size_in_bytes / 1024 / 1024, # conversion in mb
+        response.headers.get("Content-Encoding", "none")
+    )
 
 def load_management_ui_credentials(path_to_secrets_json):
     """
     Loads and retrieves username and password from a JSON file containing secret information.
 
     Args:
-        secrets_json (str): The path to the JSON file containing secret information.
+        path_to_secrets_json (str): The path to the JSON file containing secret information.
 
     Returns:
         tuple: A tuple containing the username and password retrieved from the JSON file.
+               The result is cached, so the file is only read once per path.
 
     Example:
         username, password = load_management_ui_credentials("path/to/secrets.json")
         print("Username:", username)
         print("Password:", password)
     """
-    with open(path_to_secrets_json) as f:
-        json_content = json.load(f)
+    # Cache by absolute path, so "secrets.json" and "./secrets.json" share an entry
+    # and a relative path still points to the right file after the working directory changed
+    return _read_management_ui_credentials(os.path.abspath(path_to_secrets_json))
+
+@functools.lru_cache(maxsize=8)
+def _read_management_ui_credentials(path_to_secrets_json):
+    """
+    Helper function which reads and parses the credentials file. Call cache_clear() on it to reload changed files.
+    """
+    with open(path_to_secrets_json, 'rb') as f:
+        json_content = orjson.loads(f.read())
     return json_content["username"], json_content["password"]
 
-def handle_pagination(response, base_url, endpoint, auth=None, headers=None, params=None):
+def _prepare_page_request(session, url, auth=None, headers=None):
+    """
+    Helper function which prepares the GET request for the pages of a paginated endpoint once.
+
+    Session headers, auth and cookies are merged only here. For every page the template is copied
+    and only its query string is replaced (see _page_request), before it is sent with session.send.
+    """
+    return session.prepare_request(requests.Request('GET', url, auth=auth, headers=headers))
+
+def _page_request(template, url, params):
+    """
+    Helper function which returns a copy of a prepared page request with the given query parameters.
+    """
+    prepared_request = template.copy()
+    prepared_request.prepare_url(url, params)
+    return prepared_request
+
+def _send_settings(session, url):
+    """
+    Helper function which returns the keyword arguments for sending prepared page requests with session.send.
+
+    Unlike session.get, session.send doesn't merge the environment settings, so the proxies and the CA bundle
+    (e.g. REQUESTS_CA_BUNDLE) are merged here once, the same way session.get does it for the first page.
+    """
+    settings = session.merge_environment_settings(url, {}, None, True, None)
+    return {"proxies": settings["proxies"], "verify": settings["verify"], "cert": settings["cert"], "timeout": TIMEOUT}
+
+def _iter_pages(json_content, url, auth=None, headers=None, params=None, session=None):
+    """
+    Helper generator which yields the given first page and all following pages of a paginated response.
+
+    As soon as the cursor of a page is known, the request for the next page is started on a
+    background thread. That way the next page is already loading while the current one is processed.
+    """
+    if session is None:
+        session = SESSION
+
+    template = _prepare_page_request(session, url, auth, headers)
+    send_settings = _send_settings(session, url)
+    # Only the cursor changes between the pages, so the parameters are updated in place
+    page_params = dict(params or {})
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        page = json_content
+        while True:
+            future = None
+            if page.get("nextCursor"):
+                page_params["next"] = page["nextCursor"]
+                future = executor.submit(
+                    session.send,
+                    _page_request(template, url, page_params),
+                    **send_settings
+                )
+
+            yield page
+
+            if future is None:
+                return
+
+            response = future.result()
+            if response.status_code != 200:
+                raise Exception(f"Error retrieving data from {url}. Error: {response.text}")
+
+            page = _loads(response)
+
+def _get_total(json_content):
+    """
+    Returns the total number of items of a paginated response, or None if the response doesn't tell.
+    Depending on the endpoint the count is called "total" or "totalCount".
+    """
+    total = json_content.get("total", json_content.get("totalCount"))
+    return int(total) if total is not None else None
+
+def _fetch_pages_by_offset(json_content, url, auth=None, headers=None, params=None, session=None):
+    """
+    Helper function which fetches all remaining pages of a paginated response concurrently.
+
+    If the first page tells the total number of items, the offsets of all other pages are known up-front,
+    so they are requested in parallel with skip/limit instead of following the cursors one by one.
+    Returns all pages in order, or None if the total is unknown and cursor pagination has to be used.
+    """
+    params = params or {}
+
+    total = _get_total(json_content)
+    page_size = len(json_content["items"])
+    if total is None or page_size == 0:
+        return None
+
+    if session is None:
+        session = SESSION
+
+    first_skip = int(params.get("skip", 0))
+    template = _prepare_page_request(session, url, auth, headers)
+    send_settings = _send_settings(session, url)
+
+    def fetch_page(skip):
+        response = session.send(
+            _page_request(template, url, {**params, "skip": skip, "limit": page_size}),
+            **send_settings
+        )
+
+        if response.status_code != 200:
+            raise Exception(f"Error retrieving data from {url}. Error: {response.text}")
+
+        return _loads(response)
+
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_PAGES) as executor:
+        return [json_content, *executor.map(fetch_page, range(first_skip + page_size, total, page_size))]
+
+def handle_pagination(response, base_url, endpoint, auth=None, headers=None, params=None, stream=False, session=None):
     """
     Helper function to handle pagination for API requests.
 
@@ -53,6 +353,10 @@ def handle_pagination(response, base_url, endpoint, auth=None, headers=None, par
         auth (HTTPBasicAuth, optional): Authentication for the request.
         headers (dict, optional): Headers for the request.
         params (dict, optional): Parameters for the request.
+        stream (bool, optional): Parse the following pages incrementally with ijson and append the items
+                                 directly, instead of loading each page completely. Uses less memory for
+                                 large results, but fetches the pages one after another. Defaults to False.
+        session (requests.Session, optional): Session to fetch the following pages with. Defaults to SESSION.
 
     Returns:
         dict: The complete JSON response with all paginated items.
@@ -60,66 +364,344 @@ def handle_pagination(response, base_url, endpoint, auth=None, headers=None, par
     if response.status_code != 200:
         raise Exception(f"Error retrieving data from {base_url}/{endpoint}. Error: {response.text}")
 
-    json_content = response.json()
+    json_content = _loads(response)
     if "items" not in json_content:
         return json_content
 
-    json_items = json_content["items"]
-    while json_content.get("nextCursor"):
-        params = params or {}
-        params["next"] = json_content["nextCursor"]
-        url = f'{base_url}/{endpoint}'
-        
-        response = requests.get(
-            url,
-            params=params,
-            auth=auth,
-            headers=headers,
-            verify=True
-        )
-        
-        if response.status_code != 200:
-            raise Exception(f"Error retrieving data from {url}. Error: {response.text}")
-        
-        r_content = response.json()
-        json_items.extend(r_content['items'])
-        json_content['items'] = json_items
-        json_content['nextCursor'] = r_content.get("nextCursor")
+    url = f'{base_url}/{endpoint}'
+
+    if stream:
+        if json_content.get("nextCursor"):
+            json_content["items"].extend(
+                _iter_items_streamed(url, auth, headers, {**(params or {}), "next": json_content["nextCursor"]}, session)
+            )
+        json_content["nextCursor"] = None
+        return json_content
+
+    # Collect the pages first and build the combined item list once at the end.
+    # Fetch them concurrently if the total is known, otherwise follow the cursors.
+    pages = None
+    if json_content.get("nextCursor"):
+        pages = _fetch_pages_by_offset(json_content, url, auth, headers, params, session)
+    if pages is None:
+        pages = list(_iter_pages(json_content, url, auth, headers, params, session))
+
+    json_content["items"] = list(itertools.chain.from_iterable(page["items"] for page in pages))
+    json_content["nextCursor"] = None
+
+    return json_content
+
+def _retry_delay(attempt, retry_after=None):
+    """
+    Returns the seconds to wait before the next attempt. Uses the Retry-After header of the server
+    if there is one, otherwise exponential backoff with some jitter.
+    """
+    if retry_after is not None:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return 2 ** attempt * RETRY_BACKOFF_FACTOR + random.random() * 0.1
+
+def async_session(auth=None, max_concurrency=MAX_CONCURRENT_PAGES):
+    """
+    Creates an aiohttp session for the async requests, with a capped connection pool which keeps connections alive.
+    Pass it to the *_async functions or fetch_json to reuse the connections across calls.
+
+    Args:
+        auth (aiohttp.BasicAuth, optional): Authentication for all requests of the session.
+        max_concurrency (int, optional): Maximum number of connections per host. Defaults to MAX_CONCURRENT_PAGES.
+
+    Returns:
+        aiohttp.ClientSession: The session, to be used as an async context manager.
+
+    Example:
+        async with async_session() as session:
+            users = await get_requests_api_key_async(base_url, "users", api_key, session=session)
+    """
+    connector = aiohttp.TCPConnector(limit=MAX_CONNECTIONS, limit_per_host=max_concurrency, keepalive_timeout=60, ssl=_SSL_CONTEXT)
+    timeout = aiohttp.ClientTimeout(total=60)
+    return aiohttp.ClientSession(connector=connector, auth=auth, timeout=timeout, headers=_DEFAULT_HEADERS)
+
+async def fetch_json(session, sem, url, params=None, headers=None):
+    """
+    Makes an async GET request and returns the decoded JSON of the response, without following any pagination.
+    The semaphore limits how many requests run concurrently. Rate limited (429), 5xx and connection errors
+    are retried with backoff.
+
+    Args:
+        session (aiohttp.ClientSession): The session to send the request with, see async_session.
+        sem (asyncio.Semaphore): Semaphore shared by all requests which should be limited together.
+        url (str): The full URL of the endpoint.
+        params (dict, optional): Parameters for the request.
+        headers (dict, optional): Headers for the request.
+
+    Returns:
+        dict: The JSON response.
+
+    Raises:
+        aiohttp.ClientResponseError: If the API returns an error status.
+    """
+    async with sem:
+        for attempt in range(MAX_RETRIES):
+            last_attempt = attempt == MAX_RETRIES - 1
+            try:
+                async with session.get(url, params=params, headers=headers) as response:
+                    if response.status in RETRY_STATUS_CODES and not last_attempt:
+                        logging.debug("Retrying %s after status %s", url, response.status)
+                        await asyncio.sleep(_retry_delay(attempt, response.headers.get("Retry-After")))
+                        continue
+
+                    response.raise_for_status()
+                    return await response.json(loads=orjson.loads)
+
+            except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+                if last_attempt:
+                    raise
+                logging.debug("Retrying %s after error: %r", url, e)
+                await asyncio.sleep(_retry_delay(attempt))
+
+async def handle_pagination_async(session, sem, json_content, url, headers=None, params=None):
+    """
+    Async version of handle_pagination.
+
+    If the first page tells the total number of items, all other pages are requested at once with skip/limit.
+    Otherwise the cursors are followed one after another over the keep-alive connections of the session.
+
+    Args:
+        session (aiohttp.ClientSession): The session for the requests.
+        sem (asyncio.Semaphore): Limits the number of concurrent requests.
+        json_content (dict): The decoded first page.
+        url (str): The URL of the endpoint.
+        headers (dict, optional): Headers for the request.
+        params (dict, optional): Parameters for the request.
+
+    Returns:
+        dict: The complete JSON response with all paginated items.
+    """
+    if "items" not in json_content:
+        return json_content
+
+    # Local copy, so that the cursor can be updated in place without touching the caller's dict
+    params = dict(params) if params else {}
+
+    pages = [json_content]
+    total = _get_total(json_content)
+    page_size = len(json_content["items"])
+
+    if json_content.get("nextCursor") and total is not None and page_size:
+        first_skip = int(params.get("skip", 0))
+        pages += await asyncio.gather(*[
+            fetch_json(session, sem, url, {**params, "skip": skip, "limit": page_size}, headers)
+            for skip in range(first_skip + page_size, total, page_size)
+        ])
+    else:
+        while pages[-1].get("nextCursor"):
+            params["next"] = pages[-1]["nextCursor"]
+            pages.append(await fetch_json(session, sem, url, params, headers))
+
+    json_content["items"] = list(itertools.chain.from_iterable(page["items"] for page in pages))
+    json_content["nextCursor"] = None
 
     return json_content
 
-def get_request_basic_auth(base_url, endpoint, username, password, params={}):
+async def get_request_basic_auth_async(base_url, endpoint, username, password, params=None, session=None):
     """
     Method: GET
     Component: Management UI
     See: https://api.your-url/openapi
 
+    Async version of get_request_basic_auth. The pages are fetched concurrently when possible.
+
     Args:
      - base_url: url where OpenAPI is
      - endpoint: enpoint to query
      - username: username from the Management UI user
      - password: password from the Management UI user
      - params: dictionary
+     - session: aiohttp session to reuse (optional), see async_session
     """
-    headers = {
-        'Accept': 'application/json',
-    }
+    if params is None:
+        params = {}
 
     url = f'{base_url}/{endpoint}'
-    auth = HTTPBasicAuth(username, password)
+    auth = aiohttp.BasicAuth(username, password)
+
+    async with contextlib.AsyncExitStack() as stack:
+        if session is None:
+            session = await stack.enter_async_context(async_session())
+
+        sem = asyncio.Semaphore(MAX_CONCURRENT_PAGES)
+        headers = {"Authorization": auth.encode()}
+
+        json_content = await fetch_json(session, sem, url, params, headers)
+        return await handle_pagination_async(session, sem, json_content, url, headers, params)
+
+async def get_requests_api_key_async(base_url, endpoint, api_key, params=None, session=None):
+    """
+    Method: GET
+    Component: Cognigy AI
+    See: https://api.your-url/openapi
+
+    Async version of get_requests_api_key. The pages are fetched concurrently when possible.
+
+    Args:
+    - base_url: url where OpenAPI is
+    - endpoint: endpoint to query
+    - api_key: the API key for authentication
+    - params: optional parameters for the request
+    - session: aiohttp session to reuse (optional), see async_session
+    """
+    if params is None:
+        params = {}
+
+    url = f'{base_url}/v2.0/{endpoint}'
+    headers = {'X-API-Key': api_key}
+
+    async with contextlib.AsyncExitStack() as stack:
+        if session is None:
+            session = await stack.enter_async_context(async_session())
 
-    response = requests.get(
+        sem = asyncio.Semaphore(MAX_CONCURRENT_PAGES)
+
+        json_content = await fetch_json(session, sem, url, params, headers)
+        return await handle_pagination_async(session, sem, json_content, url, headers, params)
+
+def _with_projection(params, fields=None):
+    """
+    Helper function which adds the "fields" parameter, so the server only returns the given fields of each item.
+    Returns the params unchanged if no fields are given, otherwise a copy.
+    """
+    if not fields:
+        return params
+    return {**params, 'fields': ','.join(fields)}
+
+def get_request_basic_auth(base_url, endpoint, username, password, params=None, stream=False, session=None, fields=None, minimal=False):
+    """
+    Method: GET
+    Component: Management UI
+    See: https://api.your-url/openapi
+
+    Args:
+     - base_url: url where OpenAPI is
+     - endpoint: enpoint to query
+     - username: username from the Management UI user
+     - password: password from the Management UI user
+     - params: dictionary
+     - stream: parse the following pages incrementally to save memory (optional), see handle_pagination
+     - session: requests session to use instead of the shared SESSION (optional)
+     - fields: list of the item fields to return, to cut the payload size if the endpoint supports it (optional)
+     - minimal: send "Prefer: return=minimal" to ask for a reduced representation (optional)
+    """
+    if params is None:
+        params = {}
+    if session is None:
+        session = SESSION
+
+    params = _with_projection(params, fields)
+    headers = _PREFER_MINIMAL_HEADERS if minimal else None
+
+    url = f'{base_url}/{endpoint}'
+    auth = _auth(username, password)
+
+    response = session.get(
         url,
         params=params,
         auth=auth,
         headers=headers,
-        verify=True
+        verify=True,
+        timeout=TIMEOUT
+    )
+
+    get_size_of_response(response)
+    return handle_pagination(response, base_url, endpoint, auth, headers, params=params, stream=stream, session=session)
+
+def iter_pages_basic_auth(base_url, endpoint, username, password, params=None, session=None):
+    """
+    Method: GET
+    Component: Management UI
+    See: https://api.your-url/openapi
+
+    Generator version of get_request_basic_auth. Yields the response pages one by one as they arrive,
+    so callers can start working on the first page before the rest is downloaded or stop early.
+    The next page is already requested while the current one is processed.
+
+    Args:
+     - base_url: url where OpenAPI is
+     - endpoint: enpoint to query
+     - username: username from the Management UI user
+     - password: password from the Management UI user
+     - params: dictionary
+     - session: requests session to use instead of the shared SESSION (optional)
+    """
+    if params is None:
+        params = {}
+    if session is None:
+        session = SESSION
+
+    url = f'{base_url}/{endpoint}'
+    auth = _auth(username, password)
+
+    response = session.get(
+        url,
+        params=params,
+        auth=auth,
+        verify=True,
+        timeout=TIMEOUT
     )
 
     get_size_of_response(response)
-    return handle_pagination(response, base_url, endpoint, auth, headers, params)
+    if response.status_code != 200:
+        raise Exception(f"Error retrieving data from {url}. Error: {response.text}")
+
+    json_content = _loads(response)
+    if "items" not in json_content:
+        yield json_content
+        return
+
+    yield from _iter_pages(json_content, url, auth, params=params, session=session)
+
+def iter_items_basic_auth(base_url, endpoint, username, password, params=None, session=None):
+    """
+    Method: GET
+    Component: Management UI
+    See: https://api.your-url/openapi
+
+    Like iter_pages_basic_auth, but yields the single items of all pages.
+    Pass session to use another requests session than the shared SESSION.
+    """
+    if session is None:
+        session = SESSION
+
+    yield from iter_paginated(session, f'{base_url}/{endpoint}', params, auth=_auth(username, password))
+
+def iter_paginated(session, url, params=None, auth=None, headers=None):
+    """
+    Generator which yields the items of all pages of a paginated endpoint as the pages arrive,
+    following the "nextCursor" of each page. Only the current and the prefetched next page are
+    held in memory, so large results can be processed or persisted incrementally.
+
+    Args:
+        session (requests.Session): The session to send the requests with, e.g. SESSION.
+        url (str): The full URL of the endpoint.
+        params (dict, optional): Parameters for the request.
+        auth (HTTPBasicAuth, optional): Authentication for the request.
+        headers (dict, optional): Headers for the request.
+
+    Example:
+        for user in iter_paginated(SESSION, f"{base_url}/v2.0/users", headers={"X-API-Key": api_key}):
+            print(user["_id"])
+    """
+    response = session.get(url, params=params, auth=auth, headers=headers, verify=True, timeout=TIMEOUT)
+    get_size_of_response(response)
 
-def patch_request_basic_auth(base_url, endpoint, username, password, json_payload, params={}):
+    if response.status_code != 200:
+        raise Exception(f"Error retrieving data from {url}. Error: {response.text}")
+
+    for page in _iter_pages(_loads(response), url, auth, headers, params, session):
+        yield from page.get("items", ())
+
+def patch_request_basic_auth(base_url, endpoint, username, password, json_payload, params=None, session=None):
     """
     Method: PATCH
     Component: Management UI
@@ -133,28 +715,32 @@ def patch_request_basic_auth(base_url, endpoint, username, password, json_payloa
     - password: password from the Management UI user
     - json_payload: dictionary containing the JSON data to be sent in the request body
     - params: dictionary of query parameters (optional)
+    - session: requests session to use instead of the shared SESSION (optional)
     """
-    headers = {
-        'Accept': 'application/json',
-        'Content-Type': 'application/json'
-    }
+    if params is None:
+        params = {}
+    if session is None:
+        session = SESSION
+
+    headers = _JSON_BODY_HEADERS
 
     url = f'{base_url}/{endpoint}'
-    auth = HTTPBasicAuth(username, password)
+    auth = _auth(username, password)
 
-    response = requests.patch(
+    response = session.patch(
         url,
-        json=json_payload,
+        data=_dumps(json_payload),
         params=params,
         auth=auth,
         headers=headers,
-        verify=True
+        verify=True,
+        timeout=TIMEOUT
     )
 
     get_size_of_response(response)
-    return handle_pagination(response, base_url, endpoint, auth, headers, params)
+    return handle_pagination(response, base_url, endpoint, auth, headers, params, session=session)
 
-def get_requests_api_key(base_url, endpoint, api_key, params={}):
+def get_requests_api_key(base_url, endpoint, api_key, params=None, stream=False, session=None, fields=None, minimal=False):
     """
     Method: GET
     Component: Cognigy AI
@@ -166,19 +752,103 @@ def get_requests_api_key(base_url, endpoint, api_key, params={}):
     - endpoint: endpoint to query
     - api_key: the API key for authentication
     - params: optional parameters for the request   
+    - stream: parse the following pages incrementally to save memory (optional), see handle_pagination
+    - session: requests session to use instead of the shared SESSION (optional)
+    - fields: list of the item fields to return, to cut the payload size if the endpoint supports it (optional)
+    - minimal: send "Prefer: return=minimal" to ask for a reduced representation (optional)
     """
+    if params is None:
+        params = {}
+    if session is None:
+        session = SESSION
+
+    params = _with_projection(params, fields)
     headers = {
-        'Accept': 'application/json',
         'X-API-Key': api_key
     }
+    if minimal:
+        headers.update(_PREFER_MINIMAL_HEADERS)
 
     url = f'{base_url}/v2.0/{endpoint}'
-    response = requests.get(url, params=params, headers=headers, verify=True)
+    response = session.get(url, params=params, headers=headers, verify=True, timeout=TIMEOUT)
     get_size_of_response(response)
 
-    return handle_pagination(response, f'{base_url}/v2.0', endpoint, headers=headers, params=params)
+    return handle_pagination(response, f'{base_url}/v2.0', endpoint, headers=headers, params=params, stream=stream, session=session)
+
+def _iter_streamed_items(response):
+    """
+    Helper generator which parses a streamed response with ijson and yields the entries of its "items" one by one.
+    Only a single item is held in memory at a time. Returns the "nextCursor" of the page when it is exhausted.
+    """
+    # Let urllib3 undo any gzip/deflate content encoding while reading the raw stream
+    response.raw.decode_content = True
+
+    next_cursor = None
+    builder = None
+    for prefix, event, value in ijson.parse(response.raw, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == "items.item" and event in ("end_map", "end_array"):
+                yield builder.value
+                builder = None
+        elif prefix == "items.item":
+            if event in ("start_map", "start_array"):
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+            else:
+                yield value
+        elif prefix == "nextCursor":
+            next_cursor = value
+
+    return next_cursor
+
+def _iter_items_streamed(url, auth=None, headers=None, params=None, session=None):
+    """
+    Helper generator which requests the pages of a paginated endpoint with stream=True, following the cursors,
+    and yields their items as they are parsed. Neither a whole page nor the raw body is ever held in memory.
+    """
+    if session is None:
+        session = SESSION
+
+    params = dict(params) if params else {}
+    template = _prepare_page_request(session, url, auth, headers)
+    send_settings = _send_settings(session, url)
+
+    while True:
+        with session.send(_page_request(template, url, params), stream=True, **send_settings) as response:
+            if response.status_code != 200:
+                raise Exception(f"Error retrieving data from {url}. Error: {response.text}")
+
+            next_cursor = yield from _iter_streamed_items(response)
+
+        if not next_cursor:
+            return
+        params["next"] = next_cursor
+
+def iter_items_api_key(base_url, endpoint, api_key, params=None, session=None):
+    """
+    Method: GET
+    Component: Cognigy AI
+    See: https://api.your-url/openapi
+
+    Streaming version of get_requests_api_key. Yields the items of all pages one at a time instead of
+    loading every page into memory, so large results (e.g. audit events) can be processed lazily.
+
+    Args:
+    - base_url: url where OpenAPI is
+    - endpoint: endpoint to query
+    - api_key: the API key for authentication
+    - params: optional parameters for the request
+    - session: requests session to use instead of the shared SESSION (optional)
+    """
+    headers = {
+        'X-API-Key': api_key
+    }
+
+    url = f'{base_url}/v2.0/{endpoint}'
+    yield from _iter_items_streamed(url, headers=headers, params=params, session=session)
 
-def post_requests_api_key(base_url, endpoint, api_key, params={}):
+def post_requests_api_key(base_url, endpoint, api_key, params=None, session=None):
     """
     Method: POST
     Component: Cognigy AI
@@ -189,41 +859,43 @@ def post_requests_api_key(base_url, endpoint, api_key, params={}):
      - endpoint: enpoint to query
      - api_key: api key to for authentication
      - params: dictionary
+     - session: requests session to use instead of the shared SESSION (optional)
 
     Returns:
         json: json response from the request
     """
+    if params is None:
+        params = {}
+    if session is None:
+        session = SESSION
+
     headers = {
-        'Accept': 'application/json',
         'X-API-Key': api_key
     }
 
-    params = {
-        **{
-            'ignoreOwnership': 'true',
-            'api_key': api_key,
-        },
-        **params
-    }
+    # The API key is sent in the X-API-Key header only, and the params are copied only if needed
+    if 'ignoreOwnership' not in params:
+        params = {**params, 'ignoreOwnership': 'true'}
 
     url = f'{base_url}/v2.0/{endpoint}'
 
-    response = requests.post(
+    response = session.post(
         url,
         params=params,
         headers=headers,
-        verify=True
+        verify=True,
+        timeout=TIMEOUT
     )
 
     get_size_of_response(response)
 
     if response.status_code == 204:
-        logging.info(f"Successful post request: {response.status_code}")    
+        logging.info("Successful post request: %s", response.status_code)
         return True
     else:
         raise Exception(f"Error retrieving data from {url}. Error: {response.text}")
 
-def delete_requests_api_key(base_url, endpoint, api_key, params={}):
+def delete_requests_api_key(base_url, endpoint, api_key, params=None, session=None):
     """
     Method: DELETE
     Component: Cognigy AI
@@ -234,6 +906,7 @@ def delete_requests_api_key(base_url, endpoint, api_key, params={}):
         endpoint (str): The specific API endpoint to query.
         api_key (str): The API key used for authentication.
         params (dict): A dictionary of additional parameters to include in the request.
+        session (requests.Session, optional): Session to use instead of the shared SESSION.
 
     Returns:
         dict: JSON response from the request, if applicable.
@@ -241,40 +914,73 @@ def delete_requests_api_key(base_url, endpoint, api_key, params={}):
     Raises:
         Exception: If the request fails or the API returns an error.
     """
+    if params is None:
+        params = {}
+    if session is None:
+        session = SESSION
+
     headers = {
-        'Accept': 'application/json',
         'X-API-Key': api_key
     }
 
-    params = {
-        'ignoreOwnership': 'true',
-        **params
-    }
+    if 'ignoreOwnership' not in params:
+        params = {**params, 'ignoreOwnership': 'true'}
 
     url = f'{base_url}/v2.0/{endpoint}'
 
     try:
-        response = requests.delete(
+        response = session.delete(
             url,
             params=params,
             headers=headers,
-            verify=True
+            verify=True,
+            timeout=TIMEOUT
         )
         
         get_size_of_response(response)
 
         if response.status_code in [200, 204]:
-            logging.info(f"Successful delete request: {response.status_code}")
+            logging.info("Successful delete request: %s", response.status_code)
             return True
         
         response.raise_for_status()
-        return response.json()
+        return _loads(response)
 
     except requests.exceptions.RequestException as e:
-        logging.error(f"Error during API request to {url}: {e}")
+        logging.error("Error during API request to %s: %s", url, e)
         raise Exception(f"Error retrieving data from {url}. Error: {e}")
 
-def post_request_basic_auth(base_url, endpoint, username, password, json_payload, params={}):
+def delete_many_requests_api_key(base_url, endpoint_template, ids, api_key, params=None, max_workers=MAX_CONCURRENT_PAGES, session=None):
+    """
+    Method: DELETE
+    Component: Cognigy AI
+    See: https://api.your-url/openapi
+
+    Deletes several resources concurrently with delete_requests_api_key. The requests run on a thread pool
+    and share the keep-alive connections of SESSION.
+
+    Args:
+        base_url (str): The base URL where the API is hosted.
+        endpoint_template (str): The endpoint with an "{id}" placeholder, e.g. "projects/{id}".
+        ids (iterable): The IDs of the resources to delete.
+        api_key (str): The API key used for authentication.
+        params (dict): A dictionary of additional parameters to include in each request.
+        session (requests.Session, optional): Session to use instead of the shared SESSION.
+        max_workers (int): How many requests run at the same time. Defaults to MAX_CONCURRENT_PAGES.
+
+    Returns:
+        list: The results of delete_requests_api_key, in the order of the IDs.
+
+    Example:
+        delete_many_requests_api_key(base_url, "projects/{id}", project_ids, api_key)
+    """
+    def delete(resource_id):
+        return delete_requests_api_key(base_url, endpoint_template.format(id=resource_id), api_key, params, session)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(delete, ids))
+
+def post_request_basic_auth(base_url, endpoint, username, password, json_payload=None, params=None, session=None):
     """
     Method: POST
     Component: Management UI
@@ -285,34 +991,38 @@ def post_request_basic_auth(base_url, endpoint, username, password, json_payload
     - endpoint: endpoint to query
     - username: username from the Management UI user
     - password: password from the Management UI user
-    - json_payload: dictionary containing the JSON data to be sent in the request body
+    - json_payload: dictionary containing the JSON data to be sent in the request body (optional, no body if None)
     - params: dictionary of query parameters (optional)
+    - session: requests session to use instead of the shared SESSION (optional)
     """
-    headers = {
-        'Accept': 'application/json',
-        'Content-Type': 'application/json'
-    }
+    if params is None:
+        params = {}
+    if session is None:
+        session = SESSION
+
+    headers = _JSON_BODY_HEADERS if json_payload is not None else None
 
     url = f'{base_url}/{endpoint}'
-    auth = HTTPBasicAuth(username, password)
+    auth = _auth(username, password)
 
-    response = requests.post(
+    response = session.post(
         url,
-        json=json_payload,
+        data=_dumps(json_payload) if json_payload is not None else None,
         params=params,
         auth=auth,
         headers=headers,
-        verify=True
+        verify=True,
+        timeout=TIMEOUT
     )
 
     get_size_of_response(response)
     if response.status_code in [200, 201, 204]:
-        logging.info(f"Successful post request: {response.status_code}")
-        return response.json() if response.content else True
+        logging.info("Successful post request: %s", response.status_code)
+        return _loads(response) if response.content else True
     else:
         raise Exception(f"Error posting data to {url}. Error: {response.text}")
 
-def put_request_basic_auth(base_url, endpoint, username, password, json_payload, params={}):
+def put_request_basic_auth(base_url, endpoint, username, password, json_payload, params=None, session=None):
     """
     Method: PUT
     Component: Management UI
@@ -325,28 +1035,32 @@ def put_request_basic_auth(base_url, endpoint, username, password, json_payload,
     - password: password from the Management UI user
     - json_payload: dictionary containing the JSON data to be sent in the request body
     - params: dictionary of query parameters (optional)
+    - session: requests session to use instead of the shared SESSION (optional)
     """
-    headers = {
-        'Accept': 'application/json',
-        'Content-Type': 'application/json'
-    }
+    if params is None:
+        params = {}
+    if session is None:
+        session = SESSION
+
+    headers = _JSON_BODY_HEADERS
 
     url = f'{base_url}/{endpoint}'
-    auth = HTTPBasicAuth(username, password)
+    auth = _auth(username, password)
 
-    response = requests.put(
+    response = session.put(
         url,
-        json=json_payload,
+        data=_dumps(json_payload),
         params=params,
         auth=auth,
         headers=headers,
-        verify=True
+        verify=True,
+        timeout=TIMEOUT
     )
 
     get_size_of_response(response)
-    return handle_pagination(response, base_url, endpoint, auth, headers, params)
+    return handle_pagination(response, base_url, endpoint, auth, headers, params, session=session)
 
-def put_requests_api_key(base_url, endpoint, api_key, json_payload, params={}):
+def put_requests_api_key(base_url, endpoint, api_key, json_payload, params=None, session=None):
     """
     Method: PUT
     Component: Cognigy AI
@@ -358,32 +1072,36 @@ def put_requests_api_key(base_url, endpoint, api_key, json_payload, params={}):
     - api_key: the API key for authentication
     - json_payload: dictionary containing the JSON data to be sent in the request body
     - params: optional parameters for the request   
+    - session: requests session to use instead of the shared SESSION (optional)
     """
+    if params is None:
+        params = {}
+    if session is None:
+        session = SESSION
+
     headers = {
-        'Accept': 'application/json',
         'Content-Type': 'application/json',
         'X-API-Key': api_key
     }
 
-    params = {
-        'ignoreOwnership': 'true',
-        **params
-    }
+    if 'ignoreOwnership' not in params:
+        params = {**params, 'ignoreOwnership': 'true'}
 
     url = f'{base_url}/v2.0/{endpoint}'
 
-    response = requests.put(
+    response = session.put(
         url,
-        json=json_payload,
+        data=_dumps(json_payload),
         params=params,
         headers=headers,
-        verify=True
+        verify=True,
+        timeout=TIMEOUT
     )
 
     get_size_of_response(response)
-    return handle_pagination(response, f'{base_url}/v2.0', endpoint, headers=headers, params=params)
+    return handle_pagination(response, f'{base_url}/v2.0', endpoint, headers=headers, params=params, session=session)
 
-def patch_requests_api_key(base_url, endpoint, api_key, json_payload, params={}):
+def patch_requests_api_key(base_url, endpoint, api_key, json_payload, params=None, session=None):
     """
     Method: PATCH
     Component: Cognigy AI
@@ -395,32 +1113,36 @@ def patch_requests_api_key(base_url, endpoint, api_key, json_payload, params={})
     - api_key: the API key for authentication
     - json_payload: dictionary containing the JSON data to be sent in the request body
     - params: optional parameters for the request   
+    - session: requests session to use instead of the shared SESSION (optional)
     """
+    if params is None:
+        params = {}
+    if session is None:
+        session = SESSION
+
     headers = {
-        'Accept': 'application/json',
         'Content-Type': 'application/json',
         'X-API-Key': api_key
     }
 
-    params = {
-        'ignoreOwnership': 'true',
-        **params
-    }
+    if 'ignoreOwnership' not in params:
+        params = {**params, 'ignoreOwnership': 'true'}
 
     url = f'{base_url}/v2.0/{endpoint}'
 
-    response = requests.patch(
+    response = session.patch(
         url,
-        json=json_payload,
+        data=_dumps(json_payload),
         params=params,
         headers=headers,
-        verify=True
+        verify=True,
+        timeout=TIMEOUT
     )
 
     get_size_of_response(response)
-    return handle_pagination(response, f'{base_url}/v2.0', endpoint, headers=headers, params=params)
+    return handle_pagination(response, f'{base_url}/v2.0', endpoint, headers=headers, params=params, session=session)
 
-def delete_request_basic_auth(base_url, endpoint, username, password, params={}):
+def delete_request_basic_auth(base_url, endpoint, username, password, params=None, session=None):
     """
     Method: DELETE
     Component: Management UI
@@ -432,32 +1154,34 @@ def delete_request_basic_auth(base_url, endpoint, username, password, params={})
     - username: username from the Management UI user
     - password: password from the Management UI user
     - params: dictionary of query parameters (optional)
+    - session: requests session to use instead of the shared SESSION (optional)
     """
-    headers = {
-        'Accept': 'application/json',
-    }
+    if params is None:
+        params = {}
+    if session is None:
+        session = SESSION
 
     url = f'{base_url}/{endpoint}'
-    auth = HTTPBasicAuth(username, password)
+    auth = _auth(username, password)
 
     try:
-        response = requests.delete(
+        response = session.delete(
             url,
             params=params,
             auth=auth,
-            headers=headers,
-            verify=True
+            verify=True,
+            timeout=TIMEOUT
         )
         
         get_size_of_response(response)
 
         if response.status_code in [200, 204]:
-            logging.info(f"Successful delete request: {response.status_code}")
+            logging.info("Successful delete request: %s", response.status_code)
             return True
         
         response.raise_for_status()
-        return response.json()
+        return _loads(response)
 
     except requests.exceptions.RequestException as e:
-        logging.error(f"Error during DELETE request to {url}: {e}")
+        logging.error("Error during DELETE request to %s: %s", url, e)
         raise Exception(f"Error deleting data from {url}. Error: {e}")
\ No newline at end of file
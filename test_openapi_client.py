@@ -0,0 +1,397 @@
+"""
+    Tests for the pagination, caching and bulk lookup helpers against a local mock of the OpenAPI.
+
+    The mock server runs on a random port in a background thread, so no Cognigy instance or credentials are needed.
+    Run with: python -m unittest test_openapi_client (or python -m pytest -q)
+"""
+
+import asyncio
+import json
+import requests
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import openapi_client
+import endpoints_managment_ui as via_mgmt_ui
+
+USERS = [{"_id": f"u{i}", "name": f"user{i}"} for i in range(60)]
+ADMIN_IDS = {f"u{i}" for i in range(0, 60, 7)}
+PAGE_SIZE = 25
+
+class MockOpenAPI(BaseHTTPRequestHandler):
+    """
+    Minimal mock of the user endpoints. The behaviour is switched with the class attributes by the tests.
+    """
+    protocol_version = "HTTP/1.1"
+
+    # Whether the user list reports the total number of users, which enables the skip/limit fan-out
+    with_total = True
+    # How the user list treats the "ids" filter: "support", "ignore", "reject" (answers 400), "cap" (pages of at most
+    # PAGE_SIZE users with a cursor) or "truncate" (at most PAGE_SIZE users without a cursor)
+    ids_filter = "support"
+    # Send an ETag with the user list and answer If-None-Match with 304
+    with_etag = False
+    # Seconds to wait before answering a request for the user list
+    delay = 0
+    # Status of the answer to creating an API key
+    api_key_status = 201
+    # Status of the first answer to a request below /retry/, the following ones succeed. 429 comes with Retry-After.
+    retry_status = 500
+
+    requests = []
+    not_modified = 0
+    # Number of requests below /retry/ per (method, path)
+    hits = {}
+    # Prefer header of every GET request, None if it wasn't sent
+    prefer = []
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, status, content=None, headers=None):
+        body = b"" if content is None else json.dumps(content).encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def answer_retry(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        key = (self.command, self.path)
+        with self.lock:
+            self.hits[key] = self.hits.get(key, 0) + 1
+            first = self.hits[key] == 1
+
+        if first and self.retry_status == 429:
+            return self.send_json(429, headers={"Retry-After": "0"})
+        self.send_json(self.retry_status if first else 204)
+
+    do_PUT = do_PATCH = answer_retry
+
+    def do_DELETE(self):
+        url = urlparse(self.path)
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+        with self.lock:
+            self.requests.append((url.path, {**params, "apiKey": self.headers.get("X-API-Key")}))
+
+        self.send_json(404 if url.path.endswith("/missing") else 204)
+
+    def do_GET(self):
+        if self.path.startswith("/retry/"):
+            return self.answer_retry()
+
+        url = urlparse(self.path)
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+        with self.lock:
+            self.requests.append((url.path, params))
+            self.prefer.append(self.headers.get("Prefer"))
+
+        if url.path.endswith("/users"):
+            return self.get_user_list(params)
+
+        user_id = url.path.rsplit("/", 1)[1]
+        self.send_json(200, {"_id": user_id, "roles": ["admin"] if user_id in ADMIN_IDS else ["base"]})
+
+    def do_POST(self):
+        if self.path.startswith("/retry/"):
+            return self.answer_retry()
+
+        url = urlparse(self.path)
+        with self.lock:
+            self.requests.append((url.path, {}))
+
+        if self.api_key_status < 300:
+            return self.send_json(self.api_key_status, {"apiKey": "temporary-key"})
+        self.send_json(self.api_key_status, {"error": "forbidden"})
+
+    def get_user_list(self, params):
+        time.sleep(self.delay)
+
+        if "ids" in params and self.ids_filter == "reject":
+            return self.send_json(400, {"error": "unknown parameter ids"})
+
+        if "ids" in params and self.ids_filter != "ignore":
+            ids = params["ids"].split(",")
+            items = [{**user, "roles": ["admin"] if user["_id"] in ADMIN_IDS else ["base"]} for user in USERS if user["_id"] in ids]
+            if self.ids_filter == "support":
+                return self.send_json(200, {"items": items, "nextCursor": None})
+
+            start = int(params.get("next", 0))
+            end = start + min(int(params["limit"]), PAGE_SIZE)
+            next_cursor = str(end) if self.ids_filter == "cap" and end < len(items) else None
+            return self.send_json(200, {"items": items[start:end], "nextCursor": next_cursor})
+
+        start = int(params.get("next", params.get("skip", 0)))
+        limit = int(params.get("limit", PAGE_SIZE))
+        content = {
+            "items": USERS[start:start + limit],
+            "nextCursor": str(start + limit) if start + limit < len(USERS) else None
+        }
+        if self.with_total:
+            content["total"] = len(USERS)
+        if "fields" in params:
+            content["items"] = [{name: user[name] for name in params["fields"].split(",")} for user in content["items"]]
+
+        if not self.with_etag:
+            return self.send_json(200, content)
+
+        etag = f'"users-{start}-{limit}"'
+        if self.headers.get("If-None-Match") == etag:
+            with self.lock:
+                MockOpenAPI.not_modified += 1
+            return self.send_json(304, headers={"ETag": etag})
+        self.send_json(200, content, {"ETag": etag})
+
+class CountingHTTPServer(ThreadingHTTPServer):
+    """
+    Counts the accepted connections, to check that the client reuses them.
+    """
+    connections = 0
+
+    def process_request(self, request, client_address):
+        CountingHTTPServer.connections += 1
+        super().process_request(request, client_address)
+
+class MockServerTestCase(unittest.TestCase):
+    """
+    Starts the mock server once and resets its behaviour and all client side caches before every test.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.server = CountingHTTPServer(("127.0.0.1", 0), MockOpenAPI)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        MockOpenAPI.with_total = True
+        MockOpenAPI.ids_filter = "support"
+        MockOpenAPI.with_etag = False
+        MockOpenAPI.delay = 0
+        MockOpenAPI.api_key_status = 201
+        MockOpenAPI.retry_status = 500
+        MockOpenAPI.hits = {}
+        MockOpenAPI.prefer = []
+        MockOpenAPI.requests = []
+        MockOpenAPI.not_modified = 0
+
+        openapi_client._etag_cache.clear()
+        via_mgmt_ui._bulk_support.clear()
+        via_mgmt_ui.clear_cache()
+
+    def requests_with(self, param):
+        return [params for path, params in MockOpenAPI.requests if param in params]
+
+class TestPagination(MockServerTestCase):
+
+    def test_offset_pagination(self):
+        result = openapi_client.get_requests_api_key(self.base_url, "users", "api-key")
+
+        self.assertEqual([user["_id"] for user in result["items"]], [user["_id"] for user in USERS])
+        self.assertIsNone(result["nextCursor"])
+        # The total is known, so the following pages are requested by offset instead of by cursor
+        self.assertEqual(sorted(int(params["skip"]) for params in self.requests_with("skip")), [25, 50])
+        self.assertEqual(self.requests_with("next"), [])
+
+    def test_cursor_pagination(self):
+        MockOpenAPI.with_total = False
+
+        result = openapi_client.get_request_basic_auth(self.base_url, "new/management/v2.0/users", "user", "password")
+
+        self.assertEqual([user["_id"] for user in result["items"]], [user["_id"] for user in USERS])
+        self.assertEqual([params["next"] for params in self.requests_with("next")], ["25", "50"])
+        self.assertEqual(self.requests_with("skip"), [])
+
+    def test_streamed_pagination(self):
+        MockOpenAPI.with_total = False
+
+        items = list(openapi_client.iter_items_api_key(self.base_url, "users", "api-key", params={"limit": 10}))
+
+        self.assertEqual([user["_id"] for user in items], [user["_id"] for user in USERS])
+        self.assertTrue(all(params["limit"] == "10" for path, params in MockOpenAPI.requests))
+
+    def test_async_offset_pagination(self):
+        result = asyncio.run(openapi_client.get_requests_api_key_async(self.base_url, "users", "api-key"))
+
+        self.assertEqual([user["_id"] for user in result["items"]], [user["_id"] for user in USERS])
+        self.assertEqual(sorted(int(params["skip"]) for params in self.requests_with("skip")), [25, 50])
+
+    def test_async_cursor_pagination(self):
+        MockOpenAPI.with_total = False
+
+        result = asyncio.run(openapi_client.get_request_basic_auth_async(self.base_url, "new/management/v2.0/users", "user", "password"))
+
+        self.assertEqual([user["_id"] for user in result["items"]], [user["_id"] for user in USERS])
+        self.assertEqual([params["next"] for params in self.requests_with("next")], ["25", "50"])
+
+    def test_fields_are_requested_for_every_page(self):
+        result = openapi_client.get_requests_api_key(self.base_url, "users", "api-key", fields=["_id"])
+
+        self.assertEqual(result["items"], [{"_id": user["_id"]} for user in USERS])
+        self.assertTrue(all(params["fields"] == "_id" for path, params in MockOpenAPI.requests))
+
+    def test_minimal_is_requested_for_every_page(self):
+        MockOpenAPI.with_total = False
+
+        openapi_client.get_request_basic_auth(self.base_url, "new/management/v2.0/users", "user", "password", minimal=True)
+
+        self.assertEqual(MockOpenAPI.prefer, ["return=minimal"] * 3)
+
+class TestETagCache(MockServerTestCase):
+
+    def test_not_modified_is_answered_from_cache(self):
+        MockOpenAPI.with_etag = True
+        MockOpenAPI.with_total = False
+
+        first = openapi_client.get_requests_api_key(self.base_url, "users", "api-key")
+        second = openapi_client.get_requests_api_key(self.base_url, "users", "api-key")
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(second["items"]), len(USERS))
+        # Both runs request the same three pages, the second one only gets 304 answers
+        self.assertEqual(len(MockOpenAPI.requests), 6)
+        self.assertEqual(MockOpenAPI.not_modified, 3)
+
+    def test_not_modified_releases_the_connection(self):
+        MockOpenAPI.with_etag = True
+        MockOpenAPI.with_total = False
+        # A fresh session, so the count isn't affected by connections kept alive by other tests
+        session = requests.Session()
+        session.mount("http://", openapi_client._ETagAdapter())
+        connections = CountingHTTPServer.connections
+
+        for _ in range(5):
+            openapi_client.get_requests_api_key(self.base_url, "users", "api-key", session=session)
+
+        self.assertEqual(MockOpenAPI.not_modified, 12)
+        # The cursor pages are requested one after another, so a single keep-alive connection is enough
+        self.assertEqual(CountingHTTPServer.connections - connections, 1)
+
+class TestBulkUserLookup(MockServerTestCase):
+
+    def assert_admins(self, admin_users):
+        self.assertEqual({user["_id"] for user in admin_users}, ADMIN_IDS)
+
+    def test_bulk_lookup(self):
+        self.assert_admins(via_mgmt_ui.get_admin_user_ids(self.base_url, "user", "password", progress=False))
+
+        self.assertTrue(via_mgmt_ui._bulk_support[self.base_url])
+        self.assertEqual([path for path, params in MockOpenAPI.requests if "/users/" in path], [])
+
+    def test_cancel_while_a_page_is_loading(self):
+        MockOpenAPI.delay = 0.5
+
+        lookup = via_mgmt_ui.get_admin_user_ids_async(self.base_url, "user", "password", progress=False)
+
+        # The timeout cancels the lookup while the worker thread waits for the first page
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(asyncio.wait_for(lookup, 0.1))
+
+    def test_fallback_when_filter_is_rejected(self):
+        MockOpenAPI.ids_filter = "reject"
+
+        self.assert_admins(via_mgmt_ui.get_admin_user_ids(self.base_url, "user", "password", progress=False))
+
+        self.assertFalse(via_mgmt_ui._bulk_support[self.base_url])
+        self.assertEqual(len([path for path, params in MockOpenAPI.requests if "/users/" in path]), len(USERS))
+
+    def test_bulk_lookup_follows_capped_pages(self):
+        MockOpenAPI.ids_filter = "cap"
+
+        users = via_mgmt_ui.get_users_bulk(self.base_url, "user", "password", [user["_id"] for user in USERS])
+
+        self.assertEqual(sorted(user["_id"] for user in users), sorted(user["_id"] for user in USERS))
+        self.assertTrue(via_mgmt_ui._bulk_support[self.base_url])
+        # Batches of 50 and 10 users, the first one is split into two pages by the server
+        self.assertEqual([params["next"] for params in self.requests_with("ids") if "next" in params], ["25"])
+        self.assertEqual([path for path, params in MockOpenAPI.requests if "/users/" in path], [])
+
+    def test_users_cut_off_without_cursor_are_fetched_one_by_one(self):
+        MockOpenAPI.ids_filter = "truncate"
+
+        users = via_mgmt_ui.get_users_bulk(self.base_url, "user", "password", [user["_id"] for user in USERS])
+
+        self.assertEqual(sorted(user["_id"] for user in users), sorted(user["_id"] for user in USERS))
+        # The server silently dropped the last 25 users of the first batch
+        self.assertEqual(len([path for path, params in MockOpenAPI.requests if "/users/" in path]), 25)
+
+    def test_fallback_when_filter_is_ignored(self):
+        MockOpenAPI.ids_filter = "ignore"
+
+        users = via_mgmt_ui.get_users_bulk(self.base_url, "user", "password", ["u1", "u7"])
+
+        self.assertEqual(sorted(user["_id"] for user in users), ["u1", "u7"])
+        self.assertFalse(via_mgmt_ui._bulk_support[self.base_url])
+
+class TestRetry(MockServerTestCase):
+
+    def request(self, method, path):
+        response = openapi_client.SESSION.request(method, f"{self.base_url}/retry/{path}", timeout=openapi_client.TIMEOUT)
+        return response.status_code, MockOpenAPI.hits[(method, f"/retry/{path}")]
+
+    def test_server_error_is_retried(self):
+        self.assertEqual(self.request("GET", "get"), (204, 2))
+
+    def test_post_is_not_sent_again_after_a_server_error(self):
+        # The first POST may already have been processed
+        self.assertEqual(self.request("POST", "post"), (500, 1))
+
+    def test_post_is_sent_again_when_rate_limited(self):
+        MockOpenAPI.retry_status = 429
+
+        self.assertEqual(self.request("POST", "post"), (204, 2))
+
+    def test_put_is_retried(self):
+        self.assertEqual(self.request("PUT", "put"), (204, 2))
+
+    def test_patch_is_not_sent_again_after_a_server_error(self):
+        self.assertEqual(self.request("PATCH", "patch"), (500, 1))
+
+    def test_patch_is_sent_again_when_rate_limited(self):
+        MockOpenAPI.retry_status = 429
+
+        self.assertEqual(self.request("PATCH", "patch"), (204, 2))
+
+class TestDeleteMany(MockServerTestCase):
+
+    def test_all_ids_are_deleted(self):
+        ids = [f"p{i}" for i in range(40)]
+
+        results = openapi_client.delete_many_requests_api_key(self.base_url, "projects/{id}", ids, "api-key", max_workers=8)
+
+        self.assertEqual(results, [True] * len(ids))
+        self.assertEqual(sorted(path for path, params in MockOpenAPI.requests), sorted(f"/v2.0/projects/{i}" for i in ids))
+        self.assertTrue(all(params == {"ignoreOwnership": "true", "apiKey": "api-key"} for path, params in MockOpenAPI.requests))
+
+    def test_failed_delete_raises(self):
+        with self.assertRaises(Exception):
+            openapi_client.delete_many_requests_api_key(self.base_url, "projects/{id}", ["p1", "missing"], "api-key")
+
+class TestTemporaryApiKey(MockServerTestCase):
+
+    def test_any_success_status_is_accepted(self):
+        MockOpenAPI.api_key_status = 202
+
+        api_key = via_mgmt_ui.create_temporary_api_key(self.base_url, "user", "password", "org1")
+
+        self.assertEqual(api_key, {"apiKey": "temporary-key"})
+
+    def test_failure_raises_http_error(self):
+        MockOpenAPI.api_key_status = 403
+
+        with self.assertRaises(requests.HTTPError):
+            via_mgmt_ui.create_temporary_api_key(self.base_url, "user", "password", "org1")
+
+if __name__ == "__main__":
+    unittest.main()
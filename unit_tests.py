@@ -30,7 +30,7 @@ USERNAME, PASSWORD = openapi_client.load_management_ui_credentials("secrets.json
 # Unit Test | Get the list of organizations
 """
 list = via_mgmt_ui.get_organisations(BASE_URL, USERNAME, PASSWORD)
-logging.info(f"list: {list}")
+logging.info("list: %s", list)
 """
 
 ################################################################################################